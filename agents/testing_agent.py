@@ -1,24 +1,143 @@
 """Main testing agent that orchestrates test case generation and automation."""
 import asyncio
-import json
 import logging
 import os
+import re
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
-from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
+from types import MappingProxyType
 
-import openai
-from openai import OpenAI
+import aiohttp
+from openai import AsyncOpenAI
 
-from config import config
+from config import get_config
 from mcp_clients.atlassian_client import AtlassianMCPClient
-from mcp_clients.playwright_client import PlaywrightMCPClient
+from mcp_clients.playwright_client import PlaywrightMCPClient, get_shared_client, release_shared_client
+from utils.json_utils import JsonArrayStream, json_loads
 
 logger = logging.getLogger(__name__)
 
+# Acceptance criteria markers, matched case-insensitively anywhere in a line
+_AC_KEYWORD_RE = re.compile(r'acceptance criteria|ac:|given|when|then', re.IGNORECASE)
+_AC_STEP_RE = re.compile(r'given|when|then|and', re.IGNORECASE)
+_BULLET_RE = re.compile(r'[-*•]\s*(.*)')
 
-class TestType(Enum):
+# Shared read-only default for Jira issues without a fields object
+_EMPTY_FIELDS = MappingProxyType({})
+
+# Report status labels keyed by whether the test passed
+_STATUS_LABELS = {True: "✅ PASSED", False: "❌ FAILED"}
+
+# Maximum number of test cases sent to OpenAI in a single script-generation request
+_SCRIPT_BATCH_SIZE = 5
+
+_WEB_SCRIPT_REQUIREMENTS = """The script should:
+1. Use async/await syntax
+2. Include proper error handling
+3. Take screenshots at key points
+4. Generate assertions for validation
+5. Return True/False for test result
+
+Assume the PlaywrightMCPClient is already initialized and connected, and that the script
+receives a `context_id` parameter naming the browser context opened for this test.
+Pass context_id=context_id to every call; without it the action runs outside the test's context.
+Use these methods:
+- await playwright_client.navigate_to_page(url, context_id=context_id)
+- await playwright_client.click_element(selector, context_id=context_id)
+- await playwright_client.fill_input(selector, text, context_id=context_id)
+- await playwright_client.wait_for_element(selector, context_id=context_id)
+- await playwright_client.fill_inputs({selector: text, ...}, context_id=context_id)  # fills independent fields at once
+- await playwright_client.wait_for_elements([selector, ...], context_id=context_id)  # waits on independent elements at once
+- await playwright_client.take_screenshot(path, context_id=context_id)
+- await playwright_client.get_page_content(context_id=context_id)
+
+Prefer fill_inputs and wait_for_elements over consecutive fill_input or wait_for_element calls
+whenever the fields or elements do not depend on each other."""
+
+_API_SCRIPT_REQUIREMENTS = """The script should:
+1. Take an aiohttp.ClientSession as a `session` parameter and use it for all HTTP requests (never create or close a session)
+2. Include proper error handling
+3. Validate response status codes
+4. Validate response content
+5. Return True/False for test result"""
+
+# Prompt templates, filled in with str.format at request time
+_TC_PROMPT_TMPL = """As a QA engineer, generate comprehensive test cases for the following user story:
+
+**Summary:** {summary}
+**Description:** {description}
+**Acceptance Criteria:** {acceptance_criteria}
+
+Generate test cases that cover:
+1. Happy path scenarios
+2. Edge cases
+3. Error handling
+4. UI/UX validation (if applicable)
+5. API testing (if applicable)
+
+For each test case, determine if it should be:
+- web_ui: Can be automated with browser automation
+- api: Can be automated with API calls
+- manual: Requires manual testing
+
+For web_ui and api test cases, also write the Python function that automates
+the test case and return it in the "automation_script" field. Omit the field
+for manual test cases.
+
+Web UI automation scripts use Playwright. {web_requirements}
+
+API automation scripts: {api_requirements}
+
+Return the response as a JSON array with this structure:
+[
+    {{
+        "title": "Test case title",
+        "description": "Detailed description of what to test",
+        "test_type": "web_ui|api|manual",
+        "steps": ["Step 1", "Step 2", "Step 3"],
+        "expected_result": "What should happen",
+        "priority": "High|Medium|Low",
+        "automation_script": "Python function code"
+    }}
+]
+
+Generate 5-10 comprehensive test cases."""
+
+_SCRIPT_PROMPT_TMPL = """Generate a Python script {framework} for the following test case:
+
+**Title:** {title}
+**Description:** {description}
+**Steps:** {steps}
+**Expected Result:** {expected_result}
+
+{requirements}
+
+Return only the Python function code."""
+
+_SCRIPT_BATCH_PROMPT_TMPL = """Generate a Python script {framework} for each of the following test cases:
+
+{cases}
+
+{requirements}
+
+Return the response as a JSON object with this structure, where "id" is the test case number:
+{{
+    "scripts": [
+        {{"id": 1, "script": "Python function code"}}
+    ]
+}}"""
+
+_SCRIPT_BATCH_CASE_TMPL = """Test case {number}:
+**Title:** {title}
+**Description:** {description}
+**Steps:** {steps}
+**Expected Result:** {expected_result}"""
+
+
+class TestType(str, Enum):
     """Types of tests that can be automated."""
     WEB_UI = "web_ui"
     API = "api"
@@ -45,27 +164,41 @@ class TestSuite:
     user_story: str
     test_cases: List[TestCase]
     created_at: datetime
+    # Rendered markdown, filled in by format_test_cases_as_markdown on first use
+    _markdown: Optional[str] = field(default=None, init=False, repr=False, compare=False)
 
 
 class TestingAgent:
     """Main testing agent that handles the entire testing workflow."""
     
     def __init__(self):
-        self.openai_client = OpenAI(api_key=config.openai_api_key)
+        self.openai_client = AsyncOpenAI(api_key=get_config().openai_api_key)
         self.atlassian_client = AtlassianMCPClient()
-        self.playwright_client = PlaywrightMCPClient()
+        # Shared with other agents in the process; acquired in initialize()
+        self.playwright_client: Optional[PlaywrightMCPClient] = None
         self.current_test_suite: Optional[TestSuite] = None
+        self.http_session: Optional[aiohttp.ClientSession] = None
     
     async def initialize(self):
-        """Initialize all MCP clients."""
+        """Initialize all MCP clients and the shared HTTP session."""
         await self.atlassian_client.connect()
-        await self.playwright_client.connect()
+        self.playwright_client = await get_shared_client()
+        # Pooled connections shared by every API automation script
+        self.http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+        )
         logger.info("Testing agent initialized successfully")
     
     async def cleanup(self):
         """Cleanup all resources."""
         await self.atlassian_client.disconnect()
-        await self.playwright_client.disconnect()
+        if self.playwright_client:
+            # Shutting down, so there is no reconnect to wait for
+            await release_shared_client(delay=0)
+            self.playwright_client = None
+        if self.http_session:
+            await self.http_session.close()
+            self.http_session = None
         logger.info("Testing agent cleaned up")
     
     async def generate_test_cases_from_jira_story(self, story_key: str) -> Optional[TestSuite]:
@@ -77,42 +210,75 @@ class TestingAgent:
                 logger.error(f"Could not retrieve Jira story: {story_key}")
                 return None
             
-            story_data = json.loads(story_data) if isinstance(story_data, str) else story_data
-            
-            # Extract story information
-            summary = story_data.get('fields', {}).get('summary', '')
-            description = story_data.get('fields', {}).get('description', '')
-            acceptance_criteria = self._extract_acceptance_criteria(description)
-            
-            # Generate test cases using OpenAI
-            test_cases = await self._generate_test_cases_with_ai(
-                summary=summary,
-                description=description,
-                acceptance_criteria=acceptance_criteria
-            )
-            
-            if test_cases:
-                self.current_test_suite = TestSuite(
-                    title=f"Test Suite for {story_key}",
-                    description=f"Generated test cases for user story: {summary}",
-                    user_story=f"{story_key}: {summary}",
-                    test_cases=test_cases,
-                    created_at=datetime.now()
-                )
-                
-                logger.info(f"Generated {len(test_cases)} test cases for story {story_key}")
-                return self.current_test_suite
+            test_suite = await self._build_test_suite(story_key, story_data)
+            if test_suite:
+                self.current_test_suite = test_suite
+                return test_suite
             
         except Exception as e:
             logger.error(f"Error generating test cases from Jira story {story_key}: {e}")
         
         return None
     
-    def _extract_acceptance_criteria(self, description: str) -> List[str]:
+    async def generate_test_cases_from_jira_stories(self, story_keys: List[str]) -> List[Optional[TestSuite]]:
+        """Generate test cases for several Jira user stories concurrently."""
+        stories = await self.atlassian_client.get_jira_issues(story_keys)
+        
+        # Bound parallel OpenAI requests to stay within rate limits
+        semaphore = asyncio.Semaphore(get_config().max_concurrent_ai_requests)
+        
+        async def generate(story_key: str, story_data: Any) -> Optional[TestSuite]:
+            if isinstance(story_data, BaseException) or not story_data:
+                logger.error(f"Could not retrieve Jira story: {story_key}")
+                return None
+            
+            async with semaphore:
+                try:
+                    return await self._build_test_suite(story_key, story_data)
+                except Exception as e:
+                    logger.error(f"Error generating test cases from Jira story {story_key}: {e}")
+                    return None
+        
+        return await asyncio.gather(
+            *[generate(story_key, story_data) for story_key, story_data in zip(story_keys, stories)]
+        )
+    
+    async def _build_test_suite(self, story_key: str, story_data: Any) -> Optional[TestSuite]:
+        """Generate a test suite from raw Jira story data."""
+        story_data = json_loads(story_data) if isinstance(story_data, str) else story_data
+        
+        # Extract story information
+        fields = story_data.get('fields') or _EMPTY_FIELDS
+        summary = fields.get('summary', '')
+        description = fields.get('description', '')
+        acceptance_criteria = self._extract_acceptance_criteria(description)
+        
+        # Generate test cases using OpenAI
+        test_cases = await self._generate_test_cases_with_ai(
+            summary=summary,
+            description=description,
+            acceptance_criteria=acceptance_criteria
+        )
+        
+        if not test_cases:
+            return None
+        
+        logger.info(f"Generated {len(test_cases)} test cases for story {story_key}")
+        return TestSuite(
+            title=f"Test Suite for {story_key}",
+            description=f"Generated test cases for user story: {summary}",
+            user_story=f"{story_key}: {summary}",
+            test_cases=test_cases,
+            created_at=datetime.now()
+        )
+    
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _extract_acceptance_criteria(description: str) -> Tuple[str, ...]:
         """Extract acceptance criteria from the story description."""
         criteria = []
         if not description:
-            return criteria
+            return ()
         
         # Look for common acceptance criteria patterns
         lines = description.split('\n')
@@ -120,86 +286,83 @@ class TestingAgent:
         
         for line in lines:
             line = line.strip()
-            if any(keyword in line.lower() for keyword in ['acceptance criteria', 'ac:', 'given', 'when', 'then']):
+            if _AC_KEYWORD_RE.search(line):
                 in_criteria_section = True
-                if line.lower().startswith(('given', 'when', 'then', 'and')):
+                if _AC_STEP_RE.match(line):
                     criteria.append(line)
-            elif in_criteria_section and line.startswith(('-', '*', '•')):
-                criteria.append(line[1:].strip())
-            elif in_criteria_section and not line:
-                in_criteria_section = False
+            elif in_criteria_section:
+                bullet = _BULLET_RE.match(line)
+                if bullet:
+                    criteria.append(bullet.group(1))
+                elif not line:
+                    in_criteria_section = False
         
-        return criteria
+        return tuple(criteria)
     
-    async def _generate_test_cases_with_ai(self, summary: str, description: str, acceptance_criteria: List[str]) -> List[TestCase]:
+    async def _generate_test_cases_with_ai(self, summary: str, description: str, acceptance_criteria: Sequence[str]) -> List[TestCase]:
         """Generate test cases using OpenAI."""
         try:
-            prompt = f"""
-            As a QA engineer, generate comprehensive test cases for the following user story:
-            
-            **Summary:** {summary}
-            **Description:** {description}
-            **Acceptance Criteria:** {' | '.join(acceptance_criteria)}
-            
-            Generate test cases that cover:
-            1. Happy path scenarios
-            2. Edge cases
-            3. Error handling
-            4. UI/UX validation (if applicable)
-            5. API testing (if applicable)
-            
-            For each test case, determine if it should be:
-            - web_ui: Can be automated with browser automation
-            - api: Can be automated with API calls
-            - manual: Requires manual testing
-            
-            Return the response as a JSON array with this structure:
-            [
-                {{
-                    "title": "Test case title",
-                    "description": "Detailed description of what to test",
-                    "test_type": "web_ui|api|manual",
-                    "steps": ["Step 1", "Step 2", "Step 3"],
-                    "expected_result": "What should happen",
-                    "priority": "High|Medium|Low"
-                }}
+            return [
+                test_case
+                async for test_case in self._stream_test_cases_with_ai(summary, description, acceptance_criteria)
             ]
-            
-            Generate 5-10 comprehensive test cases.
-            """
-            
-            response = self.openai_client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert QA engineer who creates comprehensive test cases. Always respond with valid JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
-            
-            test_cases_data = json.loads(response.choices[0].message.content)
-            test_cases = []
-            
-            for tc_data in test_cases_data:
-                test_case = TestCase(
-                    title=tc_data['title'],
-                    description=tc_data['description'],
-                    test_type=TestType(tc_data['test_type']),
-                    steps=tc_data['steps'],
-                    expected_result=tc_data['expected_result'],
-                    priority=tc_data.get('priority', 'Medium')
-                )
-                test_cases.append(test_case)
-            
-            return test_cases
-            
         except Exception as e:
             logger.error(f"Error generating test cases with AI: {e}")
             return []
     
+    async def _stream_test_cases_with_ai(self, summary: str, description: str, acceptance_criteria: Sequence[str]) -> AsyncIterator[TestCase]:
+        """Stream test cases from OpenAI, yielding each one as soon as its JSON object is complete."""
+        prompt = _TC_PROMPT_TMPL.format(
+            summary=summary,
+            description=description,
+            acceptance_criteria=' | '.join(acceptance_criteria),
+            web_requirements=_WEB_SCRIPT_REQUIREMENTS,
+            api_requirements=_API_SCRIPT_REQUIREMENTS
+        )
+        
+        stream = await self.openai_client.chat.completions.create(
+            model="gpt-4",
+            messages=[
+                {"role": "system", "content": "You are an expert QA engineer who creates comprehensive test cases. Always respond with valid JSON only."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,
+            stream=True
+        )
+        
+        parser = JsonArrayStream()
+        finish_reason = None
+        # Closes the HTTP response even when parsing fails or the caller stops early
+        async with stream:
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                finish_reason = chunk.choices[0].finish_reason or finish_reason
+                if not chunk.choices[0].delta.content:
+                    continue
+                for tc_data in parser.feed(chunk.choices[0].delta.content):
+                    test_type = TestType(tc_data['test_type'])
+                    yield TestCase(
+                        title=tc_data['title'],
+                        description=tc_data['description'],
+                        test_type=test_type,
+                        steps=tc_data['steps'],
+                        expected_result=tc_data['expected_result'],
+                        priority=tc_data.get('priority', 'Medium'),
+                        automation_script=tc_data.get('automation_script') if test_type != TestType.MANUAL else None
+                    )
+        
+        # A suite cut off at the token limit must not pass for a complete one
+        if finish_reason == "length":
+            raise ValueError("test case completion was truncated at the token limit")
+        parser.close()
+    
     def format_test_cases_as_markdown(self, test_suite: TestSuite) -> str:
-        """Format test cases as markdown for display."""
-        md_content = f"""# {test_suite.title}
+        """Format test cases as markdown for display, rendering each suite once."""
+        if test_suite._markdown is not None:
+            return test_suite._markdown
+        
+        parts = [f"""# {test_suite.title}
 
 **User Story:** {test_suite.user_story}
 **Description:** {test_suite.description}
@@ -209,24 +372,25 @@ class TestingAgent:
 
 ## Test Cases
 
-"""
+"""]
         
         for i, test_case in enumerate(test_suite.test_cases, 1):
-            md_content += f"""### {i}. {test_case.title}
+            parts.append(f"""### {i}. {test_case.title}
 
-**Type:** {test_case.test_type.value.replace('_', ' ').title()}
+**Type:** {test_case.test_type.replace('_', ' ').title()}
 **Priority:** {test_case.priority}
 
 **Description:** {test_case.description}
 
 **Steps:**
-"""
+""")
             for j, step in enumerate(test_case.steps, 1):
-                md_content += f"{j}. {step}\n"
+                parts.append(f"{j}. {step}\n")
             
-            md_content += f"\n**Expected Result:** {test_case.expected_result}\n\n---\n\n"
+            parts.append(f"\n**Expected Result:** {test_case.expected_result}\n\n---\n\n")
         
-        return md_content
+        test_suite._markdown = "".join(parts)
+        return test_suite._markdown
     
     async def generate_automation_script(self, test_case: TestCase) -> Optional[str]:
         """Generate automation script for a test case."""
@@ -248,36 +412,77 @@ class TestingAgent:
             logger.error(f"Error generating automation script: {e}")
             return None
     
-    async def _generate_web_automation_script(self, test_case: TestCase) -> str:
-        """Generate web automation script using Playwright."""
-        prompt = f"""
-        Generate a Python script using Playwright for the following test case:
+    async def generate_automation_scripts(self, test_cases: List[TestCase]) -> List[Optional[str]]:
+        """Generate automation scripts for several test cases using batched requests."""
+        batches = []
+        for test_type in (TestType.WEB_UI, TestType.API):
+            same_type = [tc for tc in test_cases if tc.test_type == test_type]
+            for start in range(0, len(same_type), _SCRIPT_BATCH_SIZE):
+                batches.append((test_type, same_type[start:start + _SCRIPT_BATCH_SIZE]))
         
-        **Title:** {test_case.title}
-        **Description:** {test_case.description}
-        **Steps:** {' | '.join(test_case.steps)}
-        **Expected Result:** {test_case.expected_result}
+        await asyncio.gather(
+            *[self._generate_automation_script_batch(test_type, batch) for test_type, batch in batches]
+        )
+        
+        # Fall back to one request per test case for anything the batches missed
+        missing = [tc for tc in test_cases if tc.test_type != TestType.MANUAL and not tc.automation_script]
+        if missing:
+            await asyncio.gather(*[self.generate_automation_script(tc) for tc in missing])
         
-        The script should:
-        1. Use async/await syntax
-        2. Include proper error handling
-        3. Take screenshots at key points
-        4. Generate assertions for validation
-        5. Return True/False for test result
+        return [tc.automation_script for tc in test_cases]
+    
+    async def _generate_automation_script_batch(self, test_type: TestType, test_cases: List[TestCase]):
+        """Generate automation scripts for test cases of one type in a single OpenAI request."""
+        if test_type == TestType.WEB_UI:
+            framework = "using Playwright"
+            requirements = _WEB_SCRIPT_REQUIREMENTS
+        else:
+            framework = "for API testing"
+            requirements = _API_SCRIPT_REQUIREMENTS
         
-        Assume the PlaywrightMCPClient is already initialized and connected.
-        Use these methods:
-        - await playwright_client.navigate_to_page(url)
-        - await playwright_client.click_element(selector)
-        - await playwright_client.fill_input(selector, text)
-        - await playwright_client.wait_for_element(selector)
-        - await playwright_client.take_screenshot(path)
-        - await playwright_client.get_page_content()
+        cases = "\n\n".join(
+            _SCRIPT_BATCH_CASE_TMPL.format(
+                number=i,
+                title=test_case.title,
+                description=test_case.description,
+                steps=' | '.join(test_case.steps),
+                expected_result=test_case.expected_result
+            )
+            for i, test_case in enumerate(test_cases, 1)
+        )
+        prompt = _SCRIPT_BATCH_PROMPT_TMPL.format(framework=framework, cases=cases, requirements=requirements)
         
-        Return only the Python function code.
-        """
+        try:
+            response = await self.openai_client.chat.completions.create(
+                model="gpt-4",
+                messages=[
+                    {"role": "system", "content": "You are an expert test automation engineer. Generate clean, executable Python code. Always respond with valid JSON only."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.2
+            )
+            
+            scripts_data = json_loads(response.choices[0].message.content)
+            for script_data in scripts_data.get('scripts', []):
+                index = int(script_data['id']) - 1
+                if 0 <= index < len(test_cases) and script_data.get('script'):
+                    test_cases[index].automation_script = script_data['script']
+            
+        except Exception as e:
+            logger.error(f"Error generating batched automation scripts: {e}")
+    
+    async def _generate_web_automation_script(self, test_case: TestCase) -> str:
+        """Generate web automation script using Playwright."""
+        prompt = _SCRIPT_PROMPT_TMPL.format(
+            framework="using Playwright",
+            title=test_case.title,
+            description=test_case.description,
+            steps=' | '.join(test_case.steps),
+            expected_result=test_case.expected_result,
+            requirements=_WEB_SCRIPT_REQUIREMENTS
+        )
         
-        response = self.openai_client.chat.completions.create(
+        response = await self.openai_client.chat.completions.create(
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "You are an expert test automation engineer. Generate clean, executable Python code."},
@@ -290,25 +495,16 @@ class TestingAgent:
     
     async def _generate_api_automation_script(self, test_case: TestCase) -> str:
         """Generate API automation script."""
-        prompt = f"""
-        Generate a Python script for API testing for the following test case:
-        
-        **Title:** {test_case.title}
-        **Description:** {test_case.description}
-        **Steps:** {' | '.join(test_case.steps)}
-        **Expected Result:** {test_case.expected_result}
-        
-        The script should:
-        1. Use aiohttp for async HTTP requests
-        2. Include proper error handling
-        3. Validate response status codes
-        4. Validate response content
-        5. Return True/False for test result
-        
-        Return only the Python function code.
-        """
+        prompt = _SCRIPT_PROMPT_TMPL.format(
+            framework="for API testing",
+            title=test_case.title,
+            description=test_case.description,
+            steps=' | '.join(test_case.steps),
+            expected_result=test_case.expected_result,
+            requirements=_API_SCRIPT_REQUIREMENTS
+        )
         
-        response = self.openai_client.chat.completions.create(
+        response = await self.openai_client.chat.completions.create(
             model="gpt-4",
             messages=[
                 {"role": "system", "content": "You are an expert API test automation engineer. Generate clean, executable Python code."},
@@ -338,48 +534,50 @@ class TestingAgent:
     
     async def _execute_web_automation(self, test_case: TestCase) -> Tuple[bool, str, Optional[str], Optional[str]]:
         """Execute web automation using Playwright."""
+        context_id = None
         video_path = None
         screenshot_path = None
         
         try:
-            # Start browser with video recording
-            video_dir = f"./videos/{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            os.makedirs(video_dir, exist_ok=True)
-            
-            await self.playwright_client.start_browser(
-                headless=False,
-                record_video=True,
-                record_video_dir=video_dir
-            )
-            
-            # Execute the automation script
+            # One timestamp keeps the video and screenshot of a run together;
+            # microseconds keep parallel runs apart
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+            
+            # Reuse the shared browser and record this test in its own context
+            video_dir = f"./videos/{timestamp}"
+            await asyncio.to_thread(os.makedirs, video_dir, exist_ok=True)
+            
+            if not await self.playwright_client.start_browser(headless=False):
+                return False, "Web automation failed: could not start browser", None, None
+            # Waits for a free slot while pool_size other web tests hold a context
+            context_id = await self.playwright_client.acquire_context(record_video_dir=video_dir)
+            if not context_id:
+                return False, "Web automation failed: could not open browser context", None, None
+            
+            # Execute the automation script, passing it playwright_client and context_id
             # Note: In a real implementation, you'd need to safely execute the generated code
             # For now, we'll simulate execution
             
             # Take final screenshot
-            screenshot_path = f"./screenshots/test_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            os.makedirs(os.path.dirname(screenshot_path), exist_ok=True)
-            await self.playwright_client.take_screenshot(screenshot_path)
-            
-            # Close browser to finalize video
-            await self.playwright_client.close_browser()
+            screenshot_path = f"./screenshots/test_{timestamp}.png"
+            await asyncio.to_thread(os.makedirs, os.path.dirname(screenshot_path), exist_ok=True)
+            await self.playwright_client.take_screenshot(screenshot_path, context_id=context_id)
             
-            # Find video file
-            for file in os.listdir(video_dir):
-                if file.endswith('.webm'):
-                    video_path = os.path.join(video_dir, file)
-                    break
+            # Close the recording context to finalize video; the browser stays up
+            video_path = await self.playwright_client.release_context(context_id)
+            context_id = None
             
             return True, "Test executed successfully", screenshot_path, video_path
             
         except Exception as e:
-            await self.playwright_client.close_browser()
+            if context_id:
+                video_path = await self.playwright_client.release_context(context_id)
             return False, f"Web automation failed: {str(e)}", screenshot_path, video_path
     
     async def _execute_api_automation(self, test_case: TestCase) -> Tuple[bool, str, None, None]:
         """Execute API automation."""
         try:
-            # Execute the API automation script
+            # Execute the API automation script, passing it self.http_session
             # Note: In a real implementation, you'd need to safely execute the generated code
             # For now, we'll simulate execution
             
@@ -388,58 +586,65 @@ class TestingAgent:
         except Exception as e:
             return False, f"API automation failed: {str(e)}", None, None
     
-    async def generate_test_report(self, test_results: List[Dict[str, Any]]) -> str:
-        """Generate a comprehensive test report."""
+    async def generate_test_report(self, test_results: List[Dict[str, Any]], test_suite: Optional[TestSuite] = None) -> str:
+        """Generate a comprehensive test report for test_suite, or the current suite if none is given."""
+        test_suite = test_suite or self.current_test_suite
         try:
-            report_content = f"""# Test Execution Report
+            now = datetime.now()
+            parts = [f"""# Test Execution Report
 
-**Test Suite:** {self.current_test_suite.title if self.current_test_suite else 'Unknown'}
-**Execution Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+**Test Suite:** {test_suite.title if test_suite else 'Unknown'}
+**Execution Date:** {now.strftime('%Y-%m-%d %H:%M:%S')}
 
 ## Summary
 
-"""
+"""]
             
             total_tests = len(test_results)
             passed_tests = sum(1 for result in test_results if result.get('passed', False))
             failed_tests = total_tests - passed_tests
             
-            report_content += f"""- **Total Tests:** {total_tests}
+            parts.append(f"""- **Total Tests:** {total_tests}
 - **Passed:** {passed_tests}
 - **Failed:** {failed_tests}
 - **Success Rate:** {(passed_tests/total_tests*100):.1f}%
 
 ## Test Results
 
-"""
+""")
             
             for i, result in enumerate(test_results, 1):
-                status = "✅ PASSED" if result.get('passed', False) else "❌ FAILED"
-                report_content += f"""### {i}. {result.get('title', 'Unknown Test')}
+                parts.append(f"""### {i}. {result.get('title', 'Unknown Test')}
 
-**Status:** {status}
+**Status:** {_STATUS_LABELS[bool(result.get('passed', False))]}
 **Message:** {result.get('message', 'No message')}
 **Execution Time:** {result.get('duration', 'Unknown')}
 
-"""
+""")
                 
                 if result.get('screenshot'):
-                    report_content += f"**Screenshot:** {result['screenshot']}\n"
+                    parts.append(f"**Screenshot:** {result['screenshot']}\n")
                 if result.get('video'):
-                    report_content += f"**Video Recording:** {result['video']}\n"
+                    parts.append(f"**Video Recording:** {result['video']}\n")
                 
-                report_content += "\n---\n\n"
+                parts.append("\n---\n\n")
             
-            # Save report to file
-            report_path = f"./reports/test_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.md"
-            os.makedirs(os.path.dirname(report_path), exist_ok=True)
+            report_content = "".join(parts)
             
-            with open(report_path, 'w') as f:
-                f.write(report_content)
+            # Save report to file
+            report_path = f"./reports/test_report_{now.strftime('%Y%m%d_%H%M%S')}.md"
+            await asyncio.to_thread(self._write_file, report_path, report_content)
             
             logger.info(f"Test report generated: {report_path}")
             return report_path
             
         except Exception as e:
             logger.error(f"Error generating test report: {e}")
-            return "" 
\ No newline at end of file
+            return ""
+    
+    @staticmethod
+    def _write_file(path: str, content: str):
+        """Write a text file, creating its directory if needed."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(content)
\ No newline at end of file
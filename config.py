@@ -1,38 +1,46 @@
 """Configuration management for the testing agent."""
-import os
-from typing import Optional
-from pydantic import BaseSettings, Field
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Config(BaseSettings):
     """Application configuration."""
     
+    # Fields are read from the upper-cased environment variable of the same name
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore"
+    )
+    
     # OpenAI Configuration
-    openai_api_key: str = Field(..., env="OPENAI_API_KEY")
+    openai_api_key: str
     
     # Slack Configuration
-    slack_bot_token: str = Field(..., env="SLACK_BOT_TOKEN")
-    slack_app_token: str = Field(..., env="SLACK_APP_TOKEN")
-    slack_signing_secret: str = Field(..., env="SLACK_SIGNING_SECRET")
+    slack_bot_token: str
+    slack_app_token: str
+    slack_signing_secret: str
     
     # Atlassian Configuration
-    jira_url: str = Field(..., env="JIRA_URL")
-    confluence_url: str = Field(..., env="CONFLUENCE_URL")
-    atlassian_email: str = Field(..., env="ATLASSIAN_EMAIL")
-    atlassian_api_token: str = Field(..., env="ATLASSIAN_API_TOKEN")
+    jira_url: str
+    confluence_url: str
+    atlassian_email: str
+    atlassian_api_token: str
     
     # MCP Server Configuration
-    atlassian_mcp_port: int = Field(8001, env="ATLASSIAN_MCP_PORT")
-    playwright_mcp_port: int = Field(8002, env="PLAYWRIGHT_MCP_PORT")
+    atlassian_mcp_port: int = 8001
+    playwright_mcp_port: int = 8002
     
     # Application Configuration
-    debug: bool = Field(False, env="DEBUG")
-    log_level: str = Field("INFO", env="LOG_LEVEL")
-    
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    debug: bool = False
+    log_level: str = "INFO"
+    max_concurrent_ai_requests: int = 4
+    jira_cache_ttl: int = 300
+    browser_context_pool_size: int = 4
 
 
-# Global configuration instance
-config = Config() 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Return the application configuration, loading it on first use."""
+    return Config()
@@ -6,6 +6,11 @@ import signal
 import sys
 from typing import Optional
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 from utils.logging_config import setup_logging
 from slack_bot.bot import TestingSlackBot
 
@@ -102,4 +107,8 @@ if __name__ == "__main__":
         sys.exit(1)
     
     print("🚀 Starting Testing Agent Application...")
-    asyncio.run(main()) 
\ No newline at end of file
+    if uvloop is not None:
+        # libuv-based event loop for faster networking and subprocess I/O
+        uvloop.run(main())
+    else:
+        asyncio.run(main()) 
\ No newline at end of file
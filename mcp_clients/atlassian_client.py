@@ -1,63 +1,145 @@
 """Atlassian MCP client for Jira and Confluence integration."""
 import asyncio
-import json
 import logging
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from cachetools import TTLCache
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
-from config import config
+from config import get_config
+from utils.json_utils import json_loads
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of cached Jira issues and searches
+_JIRA_CACHE_SIZE = 1024
+
+
+def _error_text(result) -> str:
+    """Return the message of a tool result the server reported as failed."""
+    return result.content[0].text if result.content else "tool reported an error"
+
 
 class AtlassianMCPClient:
     """Client for interacting with Atlassian services through MCP."""
     
     def __init__(self):
         self.session: Optional[ClientSession] = None
-        self.connected = False
+        # Task that owns the server subprocess and session from connect() to disconnect()
+        self._session_task: Optional[asyncio.Task] = None
+        self._shutdown = asyncio.Event()
+        self._init_lock = asyncio.Lock()
+        self._initialized = asyncio.Event()
+        cache_ttl = get_config().jira_cache_ttl
+        self._issue_cache: TTLCache = TTLCache(maxsize=_JIRA_CACHE_SIZE, ttl=cache_ttl)
+        self._search_cache: TTLCache = TTLCache(maxsize=_JIRA_CACHE_SIZE, ttl=cache_ttl)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+    
+    @property
+    def connected(self) -> bool:
+        """Whether the client holds an initialized MCP session."""
+        return self._initialized.is_set()
     
     async def connect(self) -> bool:
-        """Connect to the Atlassian MCP server."""
-        try:
-            server_params = StdioServerParameters(
-                command="uvx",
-                args=[
-                    "mcp-atlassian",
-                    "--jira-url", config.jira_url,
-                    "--confluence-url", config.confluence_url,
-                    "--jira-email", config.atlassian_email,
-                    "--jira-api-token", config.atlassian_api_token,
-                    "--confluence-email", config.atlassian_email,
-                    "--confluence-api-token", config.atlassian_api_token,
-                ],
-                env=None
-            )
-            
-            self.session = await stdio_client(server_params).__aenter__()
-            await self.session.initialize()
-            self.connected = True
-            logger.info("Connected to Atlassian MCP server")
-            return True
+        """Connect to the Atlassian MCP server, reusing an existing connection."""
+        async with self._init_lock:
+            if self._initialized.is_set():
+                return True
             
+            ready = asyncio.get_running_loop().create_future()
+            self._shutdown.clear()
+            self._session_task = asyncio.create_task(self._run_session(ready))
+            # Shielded so a cancelled caller cannot leave the session task without a result
+            return await asyncio.shield(ready)
+    
+    async def _run_session(self, ready: asyncio.Future):
+        """Open the MCP session, hold it until disconnect(), then close it, all in this task.
+        
+        stdio_client and ClientSession run anyio cancel scopes, which must be exited by
+        the task that entered them; connect() may run in a short-lived fetch task and
+        disconnect() in a shutdown task, so neither opens or closes them directly.
+        """
+        config = get_config()
+        server_params = StdioServerParameters(
+            command="uvx",
+            args=[
+                "mcp-atlassian",
+                "--jira-url", config.jira_url,
+                "--confluence-url", config.confluence_url,
+                "--jira-email", config.atlassian_email,
+                "--jira-api-token", config.atlassian_api_token,
+                "--confluence-email", config.atlassian_email,
+                "--confluence-api-token", config.atlassian_api_token,
+            ],
+            env=None
+        )
+        
+        try:
+            async with stdio_client(server_params) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._initialized.set()
+                    logger.info("Connected to Atlassian MCP server")
+                    ready.set_result(True)
+                    
+                    await self._shutdown.wait()
         except Exception as e:
-            logger.error(f"Failed to connect to Atlassian MCP server: {e}")
-            self.connected = False
-            return False
+            if ready.done():
+                logger.error(f"Atlassian MCP session ended with an error: {e}")
+            else:
+                logger.error(f"Failed to connect to Atlassian MCP server: {e}")
+        finally:
+            self._initialized.clear()
+            self.session = None
+            if not ready.done():
+                ready.set_result(False)
     
     async def disconnect(self):
         """Disconnect from the MCP server."""
-        if self.session:
-            try:
-                await self.session.__aexit__(None, None, None)
-                self.connected = False
-                logger.info("Disconnected from Atlassian MCP server")
-            except Exception as e:
-                logger.error(f"Error disconnecting from Atlassian MCP server: {e}")
+        async with self._init_lock:
+            if self._session_task is None:
+                return
+            
+            self._shutdown.set()
+            await self._session_task
+            self._session_task = None
+            logger.info("Disconnected from Atlassian MCP server")
+    
+    def invalidate(self, issue_key: Optional[str] = None):
+        """Drop cached Jira data for an issue, or everything if no key is given."""
+        if issue_key is None:
+            self._issue_cache.clear()
+        else:
+            self._issue_cache.pop(issue_key, None)
+        # Search results may include the changed issue
+        self._search_cache.clear()
+    
+    async def _cached(self, cache: TTLCache, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a cached value, coalescing concurrent misses into a single fetch."""
+        value = cache.get(key)
+        if value is not None:
+            return value
+        
+        # Issue keys are strings and search keys are tuples, so they never collide
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        
+        value = await asyncio.shield(future)
+        if value is not None:
+            cache[key] = value
+        return value
     
     async def get_jira_issue(self, issue_key: str) -> Optional[Dict[str, Any]]:
         """Get details of a specific Jira issue."""
-        if not self.connected or not self.session:
+        return await self._cached(self._issue_cache, issue_key, lambda: self._fetch_jira_issue(issue_key))
+    
+    async def _fetch_jira_issue(self, issue_key: str) -> Optional[Dict[str, Any]]:
+        """Fetch a Jira issue from the MCP server."""
+        if not self._initialized.is_set():
             await self.connect()
         
         try:
@@ -65,14 +147,33 @@ class AtlassianMCPClient:
                 "jira_get_issue",
                 arguments={"issue_key": issue_key}
             )
+            # Tool failures come back as error results; returning None keeps them out of the cache
+            if result.isError:
+                logger.error(f"Error getting Jira issue {issue_key}: {_error_text(result)}")
+                return None
             return result.content[0].text if result.content else None
         except Exception as e:
             logger.error(f"Error getting Jira issue {issue_key}: {e}")
             return None
     
+    async def get_jira_issues(self, issue_keys: List[str]) -> List[Any]:
+        """Get details of several Jira issues concurrently, in the order requested."""
+        return await asyncio.gather(
+            *[self.get_jira_issue(issue_key) for issue_key in issue_keys],
+            return_exceptions=True
+        )
+    
     async def search_jira_issues(self, jql: str, max_results: int = 50) -> Optional[List[Dict[str, Any]]]:
         """Search Jira issues using JQL."""
-        if not self.connected or not self.session:
+        return await self._cached(
+            self._search_cache,
+            (jql, max_results),
+            lambda: self._fetch_jira_search(jql, max_results)
+        )
+    
+    async def _fetch_jira_search(self, jql: str, max_results: int) -> Optional[List[Dict[str, Any]]]:
+        """Run a JQL search on the MCP server."""
+        if not self._initialized.is_set():
             await self.connect()
         
         try:
@@ -80,8 +181,11 @@ class AtlassianMCPClient:
                 "jira_search",
                 arguments={"jql": jql, "max_results": max_results}
             )
+            if result.isError:
+                logger.error(f"Error searching Jira issues: {_error_text(result)}")
+                return None
             if result.content:
-                return json.loads(result.content[0].text)
+                return json_loads(result.content[0].text)
             return None
         except Exception as e:
             logger.error(f"Error searching Jira issues: {e}")
@@ -89,7 +193,7 @@ class AtlassianMCPClient:
     
     async def create_confluence_page(self, space_key: str, title: str, content: str, parent_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Create a new Confluence page."""
-        if not self.connected or not self.session:
+        if not self._initialized.is_set():
             await self.connect()
         
         try:
@@ -106,7 +210,7 @@ class AtlassianMCPClient:
                 arguments=args
             )
             if result.content:
-                return json.loads(result.content[0].text)
+                return json_loads(result.content[0].text)
             return None
         except Exception as e:
             logger.error(f"Error creating Confluence page: {e}")
@@ -114,7 +218,7 @@ class AtlassianMCPClient:
     
     async def update_confluence_page(self, page_id: str, title: str, content: str, version: int) -> Optional[Dict[str, Any]]:
         """Update an existing Confluence page."""
-        if not self.connected or not self.session:
+        if not self._initialized.is_set():
             await self.connect()
         
         try:
@@ -128,7 +232,7 @@ class AtlassianMCPClient:
                 }
             )
             if result.content:
-                return json.loads(result.content[0].text)
+                return json_loads(result.content[0].text)
             return None
         except Exception as e:
             logger.error(f"Error updating Confluence page: {e}")
@@ -136,7 +240,7 @@ class AtlassianMCPClient:
     
     async def search_confluence_content(self, cql: str, limit: int = 25) -> Optional[List[Dict[str, Any]]]:
         """Search Confluence content using CQL."""
-        if not self.connected or not self.session:
+        if not self._initialized.is_set():
             await self.connect()
         
         try:
@@ -145,7 +249,7 @@ class AtlassianMCPClient:
                 arguments={"cql": cql, "limit": limit}
             )
             if result.content:
-                return json.loads(result.content[0].text)
+                return json_loads(result.content[0].text)
             return None
         except Exception as e:
             logger.error(f"Error searching Confluence content: {e}")
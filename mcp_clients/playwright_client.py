@@ -2,235 +2,574 @@
 import asyncio
 import json
 import logging
-from typing import Any, Dict, List, Optional
-from mcp import ClientSession, StdioServerParameters
+import os
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+from mcp import ClientSession, McpError, StdioServerParameters
 from mcp.client.stdio import stdio_client
+from config import get_config
+from utils.json_utils import json_loads
 
 logger = logging.getLogger(__name__)
 
+# JSON-RPC error code the MCP session raises when a response does not arrive in time
+_REQUEST_TIMEOUT = 408
+
+
+class PlaywrightToolError(Exception):
+    """A Playwright tool call that the server reported as failed."""
+    
+    def __init__(self, tool: str, message: str, timed_out: bool = False):
+        super().__init__(f"{tool}: {message}")
+        self.tool = tool
+        self.timed_out = timed_out
+
+
+# Failures a tool call can surface; anything else is a bug and propagates
+_TOOL_ERRORS = (PlaywrightToolError, McpError, ConnectionError)
+
+# One-shot visibility check matching playwright_wait_for_selector's default "visible" state
+_VISIBLE_PROBE_TMPL = (
+    "(() => {{ const el = document.querySelector({selector}); "
+    "return el !== null && el.getClientRects().length > 0; }})()"
+)
+
+# Page-side variable holding a snapshot of the DOM while it is read in slices
+_CONTENT_SNAPSHOT = "window.__testingAgentContent"
+
+# Fixed playwright_pdf options, built once and shared read-only by every call
+_PDF_DEFAULTS = MappingProxyType({
+    "format": "A4",
+    "print_background": True,
+    "return_bytes": False,
+    # Kept a plain dict so it serializes as JSON; never mutate it
+    "margin": {
+        "top": "1cm",
+        "right": "1cm",
+        "bottom": "1cm",
+        "left": "1cm"
+    }
+})
+
 
 class PlaywrightMCPClient:
     """Client for web automation using Playwright through MCP."""
     
-    def __init__(self):
+    def __init__(self, pool_size: int = 4):
         self.session: Optional[ClientSession] = None
-        self.connected = False
-        self.browser_context = None
+        # Input schemas of the server's tools, listed once at connect()
+        self._tool_schemas: Dict[str, Dict[str, Any]] = {}
+        # Task that owns the server subprocess and session from connect() to disconnect()
+        self._session_task: Optional[asyncio.Task] = None
+        self._shutdown = asyncio.Event()
+        self._init_lock = asyncio.Lock()
+        self._initialized = asyncio.Event()
+        self.pool_size = pool_size
+        self._browser_id: Optional[str] = None
+        self._browser_lock = asyncio.Lock()
+        # At most pool_size contexts are open at once; acquire_context() waits for a free slot
+        self._context_slots = asyncio.Semaphore(pool_size)
+        self._open_contexts: Set[str] = set()
+    
+    @property
+    def connected(self) -> bool:
+        """Whether the client holds an initialized MCP session."""
+        return self._initialized.is_set()
     
     async def connect(self) -> bool:
-        """Connect to the Playwright MCP server."""
-        try:
-            server_params = StdioServerParameters(
-                command="npx",
-                args=["-y", "@microsoft/playwright-mcp"],
-                env=None
-            )
-            
-            self.session = await stdio_client(server_params).__aenter__()
-            await self.session.initialize()
-            self.connected = True
-            logger.info("Connected to Playwright MCP server")
-            return True
+        """Connect to the Playwright MCP server, reusing an existing connection."""
+        async with self._init_lock:
+            if self._initialized.is_set():
+                return True
             
+            ready = asyncio.get_running_loop().create_future()
+            self._shutdown.clear()
+            self._session_task = asyncio.create_task(self._run_session(ready))
+            # Shielded so a cancelled caller cannot leave the session task without a result
+            return await asyncio.shield(ready)
+    
+    async def _run_session(self, ready: asyncio.Future):
+        """Open the MCP session, hold it until disconnect(), then close it, all in this task.
+        
+        stdio_client and ClientSession run anyio cancel scopes, which must be exited by
+        the task that entered them, so callers never open or close them directly.
+        """
+        server_params = StdioServerParameters(
+            command="npx",
+            args=["-y", "@microsoft/playwright-mcp"],
+            env=None
+        )
+        
+        try:
+            async with stdio_client(server_params) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    tools = await session.list_tools()
+                    self._tool_schemas = {tool.name: tool.inputSchema for tool in tools.tools}
+                    self.session = session
+                    self._initialized.set()
+                    logger.info("Connected to Playwright MCP server")
+                    ready.set_result(True)
+                    
+                    await self._shutdown.wait()
         except Exception as e:
-            logger.error(f"Failed to connect to Playwright MCP server: {e}")
-            self.connected = False
-            return False
+            if ready.done():
+                logger.error("Playwright MCP session ended with an error: %s", e)
+            else:
+                logger.error("Failed to connect to Playwright MCP server: %s", e)
+        finally:
+            self._initialized.clear()
+            self.session = None
+            # The browser lived in the server subprocess, which is gone now
+            self._browser_id = None
+            if not ready.done():
+                ready.set_result(False)
     
     async def disconnect(self):
         """Disconnect from the MCP server."""
-        if self.session:
+        async with self._init_lock:
+            if self._session_task is None:
+                return
+            
+            # Close contexts and the browser if open
+            if self._browser_id:
+                await self.close_browser()
+            
+            self._shutdown.set()
+            await self._session_task
+            self._session_task = None
+            logger.info("Disconnected from Playwright MCP server")
+    
+    def _ensure_connected(self):
+        """Raise if the MCP session has not been opened with connect()."""
+        if not self._initialized.is_set():
+            raise RuntimeError("client not connected")
+    
+    async def _call(self, name: str, **arguments):
+        """Call a tool, dropping unset arguments and checking required ones against its schema.
+        
+        Failed tools come back as error results rather than exceptions, so they are
+        raised here as PlaywrightToolError, marked timed_out for Playwright timeouts.
+        """
+        arguments = {key: value for key, value in arguments.items() if value is not None}
+        schema = self._tool_schemas.get(name)
+        if schema:
+            missing = [key for key in schema.get("required", ()) if key not in arguments]
+            if missing:
+                raise ValueError(f"{name} is missing required arguments: {', '.join(missing)}")
+        
+        try:
+            result = await self.session.call_tool(name, arguments=arguments)
+        except McpError as e:
+            if e.error.code == _REQUEST_TIMEOUT:
+                raise PlaywrightToolError(name, str(e), timed_out=True) from e
+            raise
+        
+        if result.isError:
+            message = result.content[0].text if result.content else "tool reported an error"
+            # Playwright names its timeouts "TimeoutError: ... Timeout 30000ms exceeded"
+            raise PlaywrightToolError(name, message, timed_out="Timeout" in message)
+        return result
+    
+    @staticmethod
+    def _result_field(result, field: str) -> Optional[str]:
+        """Read a field from a JSON tool result, if present."""
+        if not result.content:
+            return None
+        try:
+            return json_loads(result.content[0].text).get(field)
+        except (ValueError, AttributeError):
+            return None
+    
+    async def start_browser(self, headless: bool = True) -> bool:
+        """Launch the shared browser once; later calls reuse it."""
+        self._ensure_connected()
+        
+        async with self._browser_lock:
+            if self._browser_id:
+                return True
+            
             try:
-                # Close browser context if open
-                if self.browser_context:
-                    await self.close_browser()
+                result = await self._call("playwright_launch_browser", headless=headless)
                 
-                await self.session.__aexit__(None, None, None)
-                self.connected = False
-                logger.info("Disconnected from Playwright MCP server")
-            except Exception as e:
-                logger.error(f"Error disconnecting from Playwright MCP server: {e}")
-    
-    async def start_browser(self, headless: bool = True, record_video: bool = True, record_video_dir: str = "./videos") -> bool:
-        """Start a new browser instance."""
-        if not self.connected or not self.session:
-            await self.connect()
-        
-        try:
-            options = {
-                "headless": headless,
-                "record_video": record_video
-            }
-            if record_video:
+                if not result.content:
+                    return False
+                self._browser_id = self._result_field(result, "browser_id") or result.content[0].text
+                logger.info("Browser started successfully")
+            except _TOOL_ERRORS as e:
+                logger.error("Error starting browser: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+                return False
+        return True
+    
+    async def _new_context(self, record_video_dir: Optional[str] = None) -> Optional[str]:
+        """Open a new context in the shared browser."""
+        try:
+            options = {"browser_id": self._browser_id}
+            if record_video_dir:
+                options["record_video"] = True
                 options["record_video_dir"] = record_video_dir
             
-            result = await self.session.call_tool(
-                "playwright_launch_browser",
-                arguments=options
-            )
-            
-            if result.content:
-                self.browser_context = True
-                logger.info("Browser started successfully")
-                return True
-            return False
-        except Exception as e:
-            logger.error(f"Error starting browser: {e}")
-            return False
+            result = await self._call("playwright_new_context", **options)
+            if not result.content:
+                return None
+            return self._result_field(result, "context_id") or result.content[0].text
+        except _TOOL_ERRORS as e:
+            logger.error("Error creating browser context: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return None
+    
+    async def _close_context(self, context_id: str) -> Optional[str]:
+        """Close a context and return the path of its recorded video, if any."""
+        try:
+            result = await self._call("playwright_close_context", context_id=context_id)
+            # The video is finalized on close and its path reported in the result
+            return self._result_field(result, "video_path")
+        except _TOOL_ERRORS as e:
+            logger.error("Error closing browser context %s: %s", context_id, e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return None
+    
+    async def acquire_context(self, record_video_dir: Optional[str] = None) -> Optional[str]:
+        """Open a fresh browser context, recording video into record_video_dir if given.
+        
+        Waits while pool_size contexts are already open. Contexts are never reused, so
+        every test starts without cookies, storage or pages left by a previous one.
+        """
+        self._ensure_connected()
+        if not self._browser_id:
+            return None
+        
+        await self._context_slots.acquire()
+        context_id = None
+        try:
+            context_id = await self._new_context(record_video_dir)
+        finally:
+            # Give the slot back on failure, including errors _new_context does not catch
+            if not context_id:
+                self._context_slots.release()
+        if not context_id:
+            return None
+        self._open_contexts.add(context_id)
+        return context_id
+    
+    async def release_context(self, context_id: str) -> Optional[str]:
+        """Close a context, freeing its slot, and return the path of its recorded video."""
+        if context_id not in self._open_contexts:
+            # Already closed along with the browser
+            return None
+        self._open_contexts.discard(context_id)
+        try:
+            return await self._close_context(context_id)
+        finally:
+            self._context_slots.release()
     
     async def close_browser(self) -> bool:
-        """Close the browser instance."""
-        if not self.connected or not self.session:
+        """Close all open contexts and then the browser."""
+        if not self._browser_id:
             return False
+        self._ensure_connected()
+        
+        context_ids = list(self._open_contexts)
+        await asyncio.gather(*[self.release_context(context_id) for context_id in context_ids])
         
         try:
-            result = await self.session.call_tool(
-                "playwright_close_browser",
-                arguments={}
-            )
-            self.browser_context = None
+            await self._call("playwright_close_browser", browser_id=self._browser_id)
             logger.info("Browser closed successfully")
             return True
-        except Exception as e:
-            logger.error(f"Error closing browser: {e}")
+        except _TOOL_ERRORS as e:
+            logger.error("Error closing browser: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return False
+        finally:
+            self._browser_id = None
     
-    async def navigate_to_page(self, url: str) -> bool:
+    async def navigate_to_page(self, url: str, context_id: Optional[str] = None) -> bool:
         """Navigate to a specific URL."""
-        if not self.connected or not self.session:
-            await self.connect()
+        self._ensure_connected()
         
         try:
-            result = await self.session.call_tool(
-                "playwright_goto",
-                arguments={"url": url}
-            )
-            logger.info(f"Navigated to {url}")
+            result = await self._call("playwright_goto", url=url, context_id=context_id)
+            logger.info("Navigated to %s", url)
             return True
-        except Exception as e:
-            logger.error(f"Error navigating to {url}: {e}")
+        except _TOOL_ERRORS as e:
+            logger.error("Error navigating to %s: %s", url, e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return False
     
-    async def click_element(self, selector: str, timeout: int = 30000) -> bool:
+    async def click_element(self, selector: str, timeout: int = 30000, context_id: Optional[str] = None) -> bool:
         """Click on an element."""
-        if not self.connected or not self.session:
-            return False
+        self._ensure_connected()
         
         try:
-            result = await self.session.call_tool(
-                "playwright_click",
-                arguments={"selector": selector, "timeout": timeout}
-            )
-            logger.info(f"Clicked element: {selector}")
+            result = await self._call("playwright_click", selector=selector, timeout=timeout, context_id=context_id)
+            logger.debug("Clicked element: %s", selector)
             return True
-        except Exception as e:
-            logger.error(f"Error clicking element {selector}: {e}")
+        except _TOOL_ERRORS as e:
+            logger.error("Error clicking element %s: %s", selector, e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return False
     
-    async def fill_input(self, selector: str, text: str, timeout: int = 30000) -> bool:
+    async def fill_input(self, selector: str, text: str, timeout: int = 30000, context_id: Optional[str] = None) -> bool:
         """Fill an input field with text."""
-        if not self.connected or not self.session:
-            return False
+        self._ensure_connected()
         
         try:
-            result = await self.session.call_tool(
-                "playwright_fill",
-                arguments={"selector": selector, "text": text, "timeout": timeout}
-            )
-            logger.info(f"Filled input {selector} with text")
+            result = await self._call("playwright_fill", selector=selector, text=text, timeout=timeout, context_id=context_id)
+            logger.debug("Filled input %s with text", selector)
             return True
-        except Exception as e:
-            logger.error(f"Error filling input {selector}: {e}")
+        except _TOOL_ERRORS as e:
+            logger.error("Error filling input %s: %s", selector, e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return False
     
-    async def wait_for_element(self, selector: str, timeout: int = 30000) -> bool:
+    async def wait_for_element(self, selector: str, timeout: int = 30000, context_id: Optional[str] = None) -> bool:
         """Wait for an element to be visible."""
-        if not self.connected or not self.session:
-            return False
+        self._ensure_connected()
+        
+        # Most elements are already there; one DOM check avoids the server's polling wait
+        if await self._element_visible_now(selector, context_id):
+            logger.debug("Element %s is visible", selector)
+            return True
         
         try:
-            result = await self.session.call_tool(
-                "playwright_wait_for_selector",
-                arguments={"selector": selector, "timeout": timeout}
-            )
-            logger.info(f"Element {selector} is visible")
+            result = await self._call("playwright_wait_for_selector", selector=selector, timeout=timeout, context_id=context_id)
+            logger.debug("Element %s is visible", selector)
             return True
-        except Exception as e:
-            logger.error(f"Error waiting for element {selector}: {e}")
+        except PlaywrightToolError as e:
+            if e.timed_out:
+                # An element that never shows up is an expected outcome, not an error
+                logger.debug("Timed out waiting for element %s", selector)
+            else:
+                logger.error("Error waiting for element %s: %s", selector, e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return False
+        except (McpError, ConnectionError) as e:
+            # The session itself failed; retrying the wait cannot help
+            logger.error("Error waiting for element %s: %s", selector, e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            raise
+    
+    @staticmethod
+    def _batch_outcome(action: str, selectors: List[str], results: List[bool]) -> Dict[str, bool]:
+        """Key batch results by selector and summarize them in one log line."""
+        outcome = dict(zip(selectors, results))
+        failed = [selector for selector, ok in outcome.items() if not ok]
+        if failed:
+            logger.warning("%s failed for %s of %s selectors: %s", action, len(failed), len(outcome), ', '.join(failed))
+        else:
+            logger.debug("%s succeeded for %s selectors", action, len(outcome))
+        return outcome
+    
+    async def fill_inputs(self, fields: Dict[str, str], timeout: int = 30000, context_id: Optional[str] = None) -> Dict[str, bool]:
+        """Fill several independent input fields concurrently, keyed by selector."""
+        results = await asyncio.gather(*[
+            self.fill_input(selector, text, timeout, context_id) for selector, text in fields.items()
+        ])
+        return self._batch_outcome("fill_inputs", list(fields), results)
+    
+    async def _element_visible_now(self, selector: str, context_id: Optional[str]) -> bool:
+        """Check once, without waiting, whether an element is visible."""
+        script = _VISIBLE_PROBE_TMPL.format(selector=json.dumps(selector))
+        try:
+            result = await self._call("playwright_evaluate", script=script, context_id=context_id)
+            return bool(result.content) and json_loads(result.content[0].text) is True
+        except (*_TOOL_ERRORS, ValueError):
+            # Selectors the DOM API rejects are left to the wait tool to report
             return False
     
-    async def take_screenshot(self, path: str = "screenshot.png") -> Optional[str]:
+    async def wait_for_elements(self, selectors: List[str], timeout: int = 30000, context_id: Optional[str] = None) -> Dict[str, bool]:
+        """Wait for several elements to be visible concurrently, keyed by selector."""
+        results = await asyncio.gather(*[
+            self.wait_for_element(selector, timeout, context_id) for selector in selectors
+        ])
+        return self._batch_outcome("wait_for_elements", selectors, results)
+    
+    async def take_screenshot(self, path: str = "screenshot.png", context_id: Optional[str] = None) -> Optional[str]:
         """Take a screenshot of the current page."""
-        if not self.connected or not self.session:
-            return None
+        self._ensure_connected()
         
         try:
-            result = await self.session.call_tool(
-                "playwright_screenshot",
-                arguments={"path": path, "full_page": True}
-            )
-            logger.info(f"Screenshot saved to {path}")
+            result = await self._call("playwright_screenshot", path=path, full_page=True, return_bytes=False, context_id=context_id)
+            if not await self._artifact_written(path):
+                logger.error("Screenshot was not written to %s", path)
+                return None
+            logger.info("Screenshot saved to %s", path)
             return path
-        except Exception as e:
-            logger.error(f"Error taking screenshot: {e}")
+        except _TOOL_ERRORS as e:
+            logger.error("Error taking screenshot: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return None
     
-    async def get_page_content(self) -> Optional[str]:
+    async def get_page_content(self, context_id: Optional[str] = None) -> Optional[str]:
         """Get the HTML content of the current page."""
-        if not self.connected or not self.session:
-            return None
+        self._ensure_connected()
         
         try:
-            result = await self.session.call_tool(
-                "playwright_get_content",
-                arguments={}
-            )
+            result = await self._call("playwright_get_content", context_id=context_id)
             if result.content:
                 return result.content[0].text
             return None
-        except Exception as e:
-            logger.error(f"Error getting page content: {e}")
+        except _TOOL_ERRORS as e:
+            logger.error("Error getting page content: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return None
     
-    async def evaluate_script(self, script: str) -> Any:
+    async def iter_page_content(self, chunk_size: int = 65536, context_id: Optional[str] = None) -> AsyncIterator[str]:
+        """Yield the HTML of the current page in slices of chunk_size characters."""
+        # Snapshot once so every slice comes from the same serialization of the DOM
+        length = await self.evaluate_script(
+            f"(() => {{ {_CONTENT_SNAPSHOT} = document.documentElement.outerHTML; "
+            f"return {_CONTENT_SNAPSHOT}.length; }})()",
+            context_id=context_id
+        )
+        if not length:
+            return
+        
+        try:
+            for start in range(0, length, chunk_size):
+                chunk = await self.evaluate_script(
+                    f"{_CONTENT_SNAPSHOT}.slice({start}, {start + chunk_size})",
+                    context_id=context_id
+                )
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            await self.evaluate_script(f"delete {_CONTENT_SNAPSHOT}", context_id=context_id)
+    
+    async def page_contains(self, needle: str, context_id: Optional[str] = None) -> bool:
+        """Check whether the page HTML contains needle, stopping at the first match."""
+        if not needle:
+            return True
+        
+        # Carry the end of the previous slice so matches spanning two slices are found
+        overlap = len(needle) - 1
+        tail = ""
+        chunks = self.iter_page_content(context_id=context_id)
+        try:
+            async for chunk in chunks:
+                window = tail + chunk
+                if needle in window:
+                    return True
+                tail = window[-overlap:] if overlap else ""
+            return False
+        finally:
+            await chunks.aclose()
+    
+    async def evaluate_script(self, script: str, context_id: Optional[str] = None) -> Any:
         """Execute JavaScript on the page."""
-        if not self.connected or not self.session:
+        self._ensure_connected()
+        
+        try:
+            result = await self._call("playwright_evaluate", script=script, context_id=context_id)
+            if result.content:
+                return json_loads(result.content[0].text)
             return None
+        except (*_TOOL_ERRORS, ValueError) as e:
+            # ValueError covers results that are not JSON, such as undefined
+            logger.error("Error evaluating script: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return None
+    
+    async def evaluate_script_raw(self, script: str, context_id: Optional[str] = None) -> Optional[bytes]:
+        """Execute JavaScript on the page and return the undecoded UTF-8 JSON result."""
+        self._ensure_connected()
         
         try:
-            result = await self.session.call_tool(
-                "playwright_evaluate",
-                arguments={"script": script}
-            )
+            result = await self._call("playwright_evaluate", script=script, context_id=context_id)
             if result.content:
-                return json.loads(result.content[0].text)
+                return result.content[0].text.encode("utf-8")
             return None
-        except Exception as e:
-            logger.error(f"Error evaluating script: {e}")
+        except _TOOL_ERRORS as e:
+            logger.error("Error evaluating script: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return None
     
-    async def generate_pdf_report(self, path: str = "test_report.pdf") -> Optional[str]:
+    async def generate_pdf_report(self, path: str = "test_report.pdf", context_id: Optional[str] = None) -> Optional[str]:
         """Generate a PDF report of the current page."""
-        if not self.connected or not self.session:
-            return None
-        
-        try:
-            result = await self.session.call_tool(
-                "playwright_pdf",
-                arguments={
-                    "path": path,
-                    "format": "A4",
-                    "print_background": True,
-                    "margin": {
-                        "top": "1cm",
-                        "right": "1cm",
-                        "bottom": "1cm",
-                        "left": "1cm"
-                    }
-                }
-            )
-            logger.info(f"PDF report generated: {path}")
+        self._ensure_connected()
+        
+        try:
+            result = await self._call("playwright_pdf", path=path, context_id=context_id, **_PDF_DEFAULTS)
+            if not await self._artifact_written(path):
+                logger.error("PDF report was not written to %s", path)
+                return None
+            logger.info("PDF report generated: %s", path)
             return path
-        except Exception as e:
-            logger.error(f"Error generating PDF report: {e}")
-            return None 
\ No newline at end of file
+        except _TOOL_ERRORS as e:
+            logger.error("Error generating PDF report: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
+            return None
+    
+    @staticmethod
+    async def _artifact_written(path: str) -> bool:
+        """Check that the server wrote an artifact to disk."""
+        try:
+            await asyncio.to_thread(os.stat, path)
+            return True
+        except OSError:
+            return False
+    
+    @staticmethod
+    def _read_bytes(path: str) -> bytes:
+        """Read a binary file."""
+        with open(path, 'rb') as f:
+            return f.read()
+    
+    async def read_artifact(self, path: str) -> Optional[bytes]:
+        """Read a screenshot or PDF from disk rather than through the MCP channel."""
+        try:
+            return await asyncio.to_thread(self._read_bytes, path)
+        except OSError as e:
+            logger.error("Error reading artifact %s: %s", path, e)
+            return None
+
+
+@asynccontextmanager
+async def playwright_client(pool_size: int = 4) -> AsyncIterator[PlaywrightMCPClient]:
+    """Yield a connected Playwright client that is disconnected on exit."""
+    client = PlaywrightMCPClient(pool_size=pool_size)
+    if not await client.connect():
+        raise RuntimeError("could not connect to Playwright MCP server")
+    try:
+        yield client
+    finally:
+        await client.disconnect()
+
+
+# Process-wide client shared by every caller of get_shared_client(), so concurrent
+# sessions reuse one playwright-mcp subprocess
+_SHARED_CLIENT: Optional[PlaywrightMCPClient] = None
+_SHARED_REFS = 0
+_SHARED_LOCK = asyncio.Lock()
+_SHARED_DISCONNECT: Optional[asyncio.Task] = None
+
+
+async def get_shared_client() -> PlaywrightMCPClient:
+    """Return the shared Playwright client, connecting it if needed."""
+    global _SHARED_CLIENT, _SHARED_REFS, _SHARED_DISCONNECT
+    async with _SHARED_LOCK:
+        # A new user arrived before the idle client was torn down; keep it
+        if _SHARED_DISCONNECT is not None:
+            _SHARED_DISCONNECT.cancel()
+            _SHARED_DISCONNECT = None
+        
+        if _SHARED_CLIENT is None:
+            _SHARED_CLIENT = PlaywrightMCPClient(pool_size=get_config().browser_context_pool_size)
+        await _SHARED_CLIENT.connect()
+        _SHARED_REFS += 1
+        return _SHARED_CLIENT
+
+
+async def release_shared_client(delay: float = 30.0):
+    """Drop a reference to the shared client, disconnecting it after delay seconds once unused."""
+    global _SHARED_REFS, _SHARED_DISCONNECT
+    async with _SHARED_LOCK:
+        _SHARED_REFS = max(_SHARED_REFS - 1, 0)
+        if _SHARED_REFS or _SHARED_CLIENT is None:
+            return
+        if delay > 0:
+            _SHARED_DISCONNECT = asyncio.create_task(_disconnect_shared_client(delay))
+            return
+    
+    await _disconnect_shared_client(0)
+
+
+async def _disconnect_shared_client(delay: float):
+    """Disconnect the shared client if it is still unused after delay seconds."""
+    global _SHARED_CLIENT, _SHARED_DISCONNECT
+    await asyncio.sleep(delay)
+    async with _SHARED_LOCK:
+        if _SHARED_REFS or _SHARED_CLIENT is None:
+            return
+        client, _SHARED_CLIENT = _SHARED_CLIENT, None
+        _SHARED_DISCONNECT = None
+        await client.disconnect()
@@ -1,10 +1,30 @@
 #!/usr/bin/env python3
 """Quick start script to validate the testing agent setup."""
+import asyncio
 import os
 import sys
-import subprocess
+from importlib.util import find_spec
 from pathlib import Path
 
+REQUIRED_VARS = (
+    'OPENAI_API_KEY',
+    'SLACK_BOT_TOKEN',
+    'SLACK_APP_TOKEN',
+    'SLACK_SIGNING_SECRET',
+    'JIRA_URL',
+    'CONFLUENCE_URL',
+    'ATLASSIAN_EMAIL',
+    'ATLASSIAN_API_TOKEN'
+)
+
+# (name, probe command, install hint, missing launcher)
+MCP_SERVER_PROBES = (
+    ("Atlassian", ['uvx', 'mcp-atlassian', '--help'], "pip install mcp-atlassian", "uvx"),
+    ("Playwright", ['npx', '@microsoft/playwright-mcp', '--help'], "npm install -g @microsoft/playwright-mcp", "npm"),
+)
+
+_ENV_LOADED = False
+
 
 def check_python_version():
     """Check if Python version is 3.8+."""
@@ -27,24 +47,13 @@ def check_environment_file():
 
 def check_required_env_vars():
     """Check if required environment variables are set."""
-    from dotenv import load_dotenv
-    load_dotenv()
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _ENV_LOADED = True
     
-    required_vars = [
-        'OPENAI_API_KEY',
-        'SLACK_BOT_TOKEN',
-        'SLACK_APP_TOKEN',
-        'SLACK_SIGNING_SECRET',
-        'JIRA_URL',
-        'CONFLUENCE_URL',
-        'ATLASSIAN_EMAIL',
-        'ATLASSIAN_API_TOKEN'
-    ]
-    
-    missing_vars = []
-    for var in required_vars:
-        if not os.getenv(var):
-            missing_vars.append(var)
+    missing_vars = tuple(var for var in REQUIRED_VARS if not os.environ.get(var))
     
     if missing_vars:
         print(f"❌ Missing environment variables: {', '.join(missing_vars)}")
@@ -56,49 +65,78 @@ def check_required_env_vars():
 
 def check_dependencies():
     """Check if required dependencies are installed."""
-    try:
-        import openai
-        import slack_bolt
-        import mcp
-        print("✅ Python dependencies are installed")
-        return True
-    except ImportError as e:
-        print(f"❌ Missing Python dependency: {e}")
+    # find_spec locates the packages without importing them
+    missing = [module for module in ("openai", "slack_bolt", "mcp") if find_spec(module) is None]
+    if missing:
+        print(f"❌ Missing Python dependency: {', '.join(missing)}")
         print("   Run: pip install -r requirements.txt")
         return False
+    
+    print("✅ Python dependencies are installed")
+    return True
 
 
-def check_mcp_servers():
-    """Check if MCP servers are available."""
-    # Check Atlassian MCP
+def check_event_loop():
+    """Report whether uvloop is available; the default event loop still works without it."""
+    if sys.platform == "win32":
+        print("ℹ️  uvloop is not supported on Windows, using the default asyncio event loop")
+        return True
+    if find_spec("uvloop") is not None:
+        print("✅ uvloop is installed and will run the event loop")
+    else:
+        print("⚠️  uvloop not installed, using the default asyncio event loop")
+        print("   Run: pip install uvloop")
+    return True
+
+
+async def _probe_mcp_server(command):
+    """Run an MCP server's --help and return its exit code, or None if it cannot run."""
     try:
-        result = subprocess.run(['uvx', 'mcp-atlassian', '--help'], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            print("✅ Atlassian MCP server is available")
-        else:
-            print("❌ Atlassian MCP server not found")
-            print("   Run: pip install mcp-atlassian")
-            return False
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        print("❌ Atlassian MCP server not found or uvx not available")
-        return False
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError:
+        return None
     
-    # Check Playwright MCP
     try:
-        result = subprocess.run(['npx', '@microsoft/playwright-mcp', '--help'], 
-                              capture_output=True, text=True, timeout=10)
-        if result.returncode == 0:
-            print("✅ Playwright MCP server is available")
+        # communicate() drains the pipes so a chatty --help cannot block on a full buffer
+        await asyncio.wait_for(process.communicate(), timeout=10)
+        return process.returncode
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        return None
+
+
+async def _check_mcp_servers_async():
+    """Probe all MCP servers at once and return their exit codes by name."""
+    return_codes = await asyncio.gather(
+        *[_probe_mcp_server(command) for _, command, _, _ in MCP_SERVER_PROBES]
+    )
+    return {name: code for (name, _, _, _), code in zip(MCP_SERVER_PROBES, return_codes)}
+
+
+def check_mcp_servers():
+    """Check if MCP servers are available."""
+    # Probe both servers at once; each can take seconds to start
+    return_codes = asyncio.run(_check_mcp_servers_async())
+    
+    all_available = True
+    for name, _, install_hint, launcher in MCP_SERVER_PROBES:
+        return_code = return_codes[name]
+        if return_code == 0:
+            print(f"✅ {name} MCP server is available")
+        elif return_code is None:
+            print(f"❌ {name} MCP server not found or {launcher} not available")
+            all_available = False
         else:
-            print("❌ Playwright MCP server not found")
-            print("   Run: npm install -g @microsoft/playwright-mcp")
-            return False
-    except (subprocess.TimeoutExpired, FileNotFoundError):
-        print("❌ Playwright MCP server not found or npm not available")
-        return False
+            print(f"❌ {name} MCP server not found")
+            print(f"   Run: {install_hint}")
+            all_available = False
     
-    return True
+    return all_available
 
 
 def create_directories():
@@ -119,6 +157,7 @@ def main():
         check_environment_file,
         check_required_env_vars,
         check_dependencies,
+        check_event_loop,
         check_mcp_servers
     ]
     
@@ -4,27 +4,136 @@ import logging
 import os
 import re
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Set
 
+from cachetools import TTLCache
 from slack_bolt.async_app import AsyncApp
 from slack_bolt.adapter.socket_mode.async_handler import AsyncSocketModeHandler
 
-from config import config
+from config import get_config
 from agents.testing_agent import TestingAgent, TestType
 
 logger = logging.getLogger(__name__)
 
+# Minimum seconds between automation progress updates in Slack
+_PROGRESS_INTERVAL = 1.0
+
+# Longest test case markdown shown inline; Slack section text is capped at 3000 characters
+_PREVIEW_LENGTH = 2900
+
+# Abandoned review sessions are dropped after this many seconds
+_SESSION_TTL = 1800
+_SESSION_CACHE_SIZE = 1024
+
+# Generated test suites are reused for this many seconds per Jira key
+_SUITE_CACHE_TTL = 300
+_SUITE_CACHE_SIZE = 256
+
+# Message patterns, compiled once at import rather than per bot or per message
+_GREETING_RE = re.compile(r"(hi|hello|hey)", re.IGNORECASE)
+_GEN_RE = re.compile(r"generate tests for ([A-Z]+-\d+)", re.IGNORECASE)
+_HELP_RE = re.compile(r"help", re.IGNORECASE)
+
+# Static Block Kit payloads, built once at import; Slack only reads them, never mutate
+_GREETING_BLOCKS = [
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "Hello! 👋 I'm your testing automation assistant!\n\nI can help you generate test cases from Jira user stories and automate them. Here's how to get started:"
+        }
+    },
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "📝 *To generate test cases:*\n`generate tests for JIRA-123`\n\n🤖 *To automate tests:*\nFirst generate test cases, then I'll ask if you want to automate them!"
+        }
+    }
+]
+
+_HELP_BLOCKS = [
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "🤖 *Testing Bot Help*\n\nHere's what I can do for you:"
+        }
+    },
+    {
+        "type": "section",
+        "fields": [
+            {
+                "type": "mrkdwn",
+                "text": "*Generate Test Cases:*\n`generate tests for PROJ-123`"
+            },
+            {
+                "type": "mrkdwn",
+                "text": "*Get Help:*\n`help`"
+            }
+        ]
+    },
+    {
+        "type": "section",
+        "text": {
+            "type": "mrkdwn",
+            "text": "🔄 *Workflow:*\n1. Provide a Jira user story\n2. Review generated test cases\n3. Approve or regenerate\n4. Choose automation or manual execution\n5. Get reports with videos and screenshots"
+        }
+    }
+]
+
+_APPROVAL_TEXT_TMPL = (
+    "🎯 *Test cases approved!*\n\nI found {automatable} automatable tests and {manual} manual tests."
+    "\n\nWould you like me to automate the web and API tests?"
+)
+
+
+def _approval_blocks(automatable: int, manual: int, user_id: str) -> List[Dict]:
+    """Build the automate-or-manual prompt shown after tests are approved."""
+    return [
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": _APPROVAL_TEXT_TMPL.format(automatable=automatable, manual=manual)
+            }
+        },
+        {
+            "type": "actions",
+            "elements": [
+                {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "🤖 Automate Tests"},
+                    "style": "primary",
+                    "action_id": "automate_tests",
+                    "value": user_id
+                },
+                {
+                    "type": "button",
+                    "text": {"type": "plain_text", "text": "📋 Manual Only"},
+                    "action_id": "manual_only",
+                    "value": user_id
+                }
+            ]
+        }
+    ]
+
 
 class TestingSlackBot:
     """Slack bot for the testing agent workflow."""
     
     def __init__(self):
+        config = get_config()
         self.app = AsyncApp(
             token=config.slack_bot_token,
             signing_secret=config.slack_signing_secret
         )
         self.testing_agent = TestingAgent()
-        self.user_sessions: Dict[str, Dict] = {}
+        # Bounded so sessions users never finish cannot accumulate
+        self.user_sessions: TTLCache = TTLCache(maxsize=_SESSION_CACHE_SIZE, ttl=_SESSION_TTL)
+        self._suite_cache: TTLCache = TTLCache(maxsize=_SUITE_CACHE_SIZE, ttl=_SUITE_CACHE_TTL)
+        # Running automation jobs, referenced here so they are not garbage collected
+        self._automation_jobs: Set[asyncio.Task] = set()
         
         # Register event handlers
         self._register_handlers()
@@ -32,49 +141,33 @@ class TestingSlackBot:
     def _register_handlers(self):
         """Register all Slack event handlers."""
         
-        @self.app.message(re.compile(r"(hi|hello|hey)", re.IGNORECASE))
+        @self.app.message(_GREETING_RE)
         async def handle_greeting(message, say):
             """Handle greeting messages."""
             await say(
                 text="Hello! 👋 I'm your testing automation assistant!",
-                blocks=[
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": "Hello! 👋 I'm your testing automation assistant!\n\nI can help you generate test cases from Jira user stories and automate them. Here's how to get started:"
-                        }
-                    },
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": "📝 *To generate test cases:*\n`generate tests for JIRA-123`\n\n🤖 *To automate tests:*\nFirst generate test cases, then I'll ask if you want to automate them!"
-                        }
-                    }
-                ]
+                blocks=_GREETING_BLOCKS
             )
         
-        @self.app.message(re.compile(r"generate tests for ([A-Z]+-\d+)", re.IGNORECASE))
-        async def handle_generate_tests(message, say):
+        @self.app.message(_GEN_RE)
+        async def handle_generate_tests(message, context, say):
             """Handle test generation requests."""
             user_id = message['user']
             channel_id = message['channel']
             
-            # Extract Jira issue key
-            match = re.search(r"([A-Z]+-\d+)", message['text'], re.IGNORECASE)
-            if not match:
-                await say("❌ Please provide a valid Jira issue key (e.g., PROJ-123)")
-                return
-            
-            jira_key = match.group(1).upper()
+            # Bolt passes the groups captured by _GEN_RE, so the key needs no second search
+            jira_key = context['matches'][0].upper()
             
             # Show loading message
             loading_response = await say("🔄 Generating test cases for `{}`. This might take a moment...".format(jira_key))
             
             try:
-                # Generate test cases
-                test_suite = await self.testing_agent.generate_test_cases_from_jira_story(jira_key)
+                # Generate test cases, reusing a recent suite for the same story
+                test_suite = self._suite_cache.get(jira_key)
+                if test_suite is None:
+                    test_suite = await self.testing_agent.generate_test_cases_from_jira_story(jira_key)
+                    if test_suite:
+                        self._suite_cache[jira_key] = test_suite
                 
                 if not test_suite:
                     await self.app.client.chat_update(
@@ -94,6 +187,7 @@ class TestingSlackBot:
                 
                 # Format test cases as markdown
                 test_cases_md = self.testing_agent.format_test_cases_as_markdown(test_suite)
+                preview = test_cases_md[:_PREVIEW_LENGTH] + ('...' if len(test_cases_md) > _PREVIEW_LENGTH else '')
                 
                 # Update the loading message with results
                 await self.app.client.chat_update(
@@ -112,7 +206,7 @@ class TestingSlackBot:
                             "type": "section",
                             "text": {
                                 "type": "mrkdwn",
-                                "text": f"```{test_cases_md[:2900]}{'...' if len(test_cases_md) > 2900 else ''}```"
+                                "text": f"```{preview}```"
                             }
                         },
                         {
@@ -137,7 +231,7 @@ class TestingSlackBot:
                 )
                 
             except Exception as e:
-                logger.error(f"Error generating test cases: {e}")
+                logger.error("Error generating test cases: %s", e)
                 await self.app.client.chat_update(
                     channel=channel_id,
                     ts=loading_response['ts'],
@@ -150,11 +244,11 @@ class TestingSlackBot:
             await ack()
             
             user_id = body['user']['id']
-            if user_id not in self.user_sessions:
+            session = self.user_sessions.get(user_id)
+            if session is None:
                 await say("❌ Session expired. Please generate test cases again.")
                 return
             
-            session = self.user_sessions[user_id]
             test_suite = session['test_suite']
             
             # Count automatable tests
@@ -163,39 +257,13 @@ class TestingSlackBot:
             
             if automatable_tests:
                 await say(
-                    blocks=[
-                        {
-                            "type": "section",
-                            "text": {
-                                "type": "mrkdwn",
-                                "text": f"🎯 *Test cases approved!*\n\nI found {len(automatable_tests)} automatable tests and {len(manual_tests)} manual tests.\n\nWould you like me to automate the web and API tests?"
-                            }
-                        },
-                        {
-                            "type": "actions",
-                            "elements": [
-                                {
-                                    "type": "button",
-                                    "text": {"type": "plain_text", "text": "🤖 Automate Tests"},
-                                    "style": "primary",
-                                    "action_id": "automate_tests",
-                                    "value": user_id
-                                },
-                                {
-                                    "type": "button",
-                                    "text": {"type": "plain_text", "text": "📋 Manual Only"},
-                                    "action_id": "manual_only",
-                                    "value": user_id
-                                }
-                            ]
-                        }
-                    ]
+                    blocks=_approval_blocks(len(automatable_tests), len(manual_tests), user_id)
                 )
                 session['step'] = 'choose_automation'
             else:
                 await say("📋 All test cases are manual tests. No automation is possible for this story.")
                 # Clean up session
-                del self.user_sessions[user_id]
+                self.user_sessions.pop(user_id, None)
         
         @self.app.action("regenerate_tests")
         async def handle_regenerate_tests(ack, body, say):
@@ -205,9 +273,10 @@ class TestingSlackBot:
             user_id = body['user']['id']
             await say("🔄 Please provide the Jira issue key again to regenerate test cases.")
             
-            # Clean up session
-            if user_id in self.user_sessions:
-                del self.user_sessions[user_id]
+            # Clean up session and forget the suite so the next request regenerates it
+            session = self.user_sessions.pop(user_id, None)
+            if session is not None:
+                self._suite_cache.pop(session['jira_key'], None)
         
         @self.app.action("automate_tests")
         async def handle_automate_tests(ack, body, say):
@@ -215,30 +284,16 @@ class TestingSlackBot:
             await ack()
             
             user_id = body['user']['id']
-            if user_id not in self.user_sessions:
+            # Claim the session now so a second click cannot start the same run twice
+            session = self.user_sessions.pop(user_id, None)
+            if session is None:
                 await say("❌ Session expired. Please generate test cases again.")
                 return
             
-            session = self.user_sessions[user_id]
-            test_suite = session['test_suite']
-            
-            # Show automation progress
-            progress_response = await say("🤖 Starting test automation. This may take several minutes...")
-            
-            try:
-                await self._execute_automation(user_id, test_suite, progress_response)
-                
-            except Exception as e:
-                logger.error(f"Error during automation: {e}")
-                await self.app.client.chat_update(
-                    channel=session['channel_id'],
-                    ts=progress_response['ts'],
-                    text="❌ An error occurred during test automation. Please try again."
-                )
-            finally:
-                # Clean up session
-                if user_id in self.user_sessions:
-                    del self.user_sessions[user_id]
+            # Automation runs for minutes; hand it off so this handler returns at once
+            job = asyncio.create_task(self._run_automation_job(user_id, session))
+            self._automation_jobs.add(job)
+            job.add_done_callback(self._automation_jobs.discard)
         
         @self.app.action("manual_only")
         async def handle_manual_only(ack, body, say):
@@ -246,107 +301,69 @@ class TestingSlackBot:
             await ack()
             
             user_id = body['user']['id']
-            if user_id not in self.user_sessions:
+            if self.user_sessions.get(user_id) is None:
                 await say("❌ Session expired. Please generate test cases again.")
                 return
             
             await say("📋 Test cases saved for manual execution. You can find them in the test case document.")
             
             # Clean up session
-            del self.user_sessions[user_id]
+            self.user_sessions.pop(user_id, None)
         
-        @self.app.message(re.compile(r"help", re.IGNORECASE))
+        @self.app.message(_HELP_RE)
         async def handle_help(message, say):
             """Handle help requests."""
             await say(
-                blocks=[
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": "🤖 *Testing Bot Help*\n\nHere's what I can do for you:"
-                        }
-                    },
-                    {
-                        "type": "section",
-                        "fields": [
-                            {
-                                "type": "mrkdwn",
-                                "text": "*Generate Test Cases:*\n`generate tests for PROJ-123`"
-                            },
-                            {
-                                "type": "mrkdwn",
-                                "text": "*Get Help:*\n`help`"
-                            }
-                        ]
-                    },
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": "🔄 *Workflow:*\n1. Provide a Jira user story\n2. Review generated test cases\n3. Approve or regenerate\n4. Choose automation or manual execution\n5. Get reports with videos and screenshots"
-                        }
-                    }
-                ]
+                blocks=_HELP_BLOCKS
             )
     
-    async def _execute_automation(self, user_id: str, test_suite, progress_response):
+    async def _run_automation_job(self, user_id: str, session: Dict):
+        """Run a user's test automation in the background and report failures in Slack."""
+        channel_id = session['channel_id']
+        progress_response = None
+        try:
+            # Show automation progress
+            progress_response = await self.app.client.chat_postMessage(
+                channel=channel_id,
+                text="🤖 Starting test automation. This may take several minutes..."
+            )
+            await self._execute_automation(session, progress_response)
+            
+        except Exception as e:
+            logger.error("Error during automation for %s: %s", user_id, e)
+            text = "❌ An error occurred during test automation. Please try again."
+            # Nothing awaits this task, so a failed notice must be logged here, not raised
+            try:
+                if progress_response is not None:
+                    await self.app.client.chat_update(channel=channel_id, ts=progress_response['ts'], text=text)
+                else:
+                    await self.app.client.chat_postMessage(channel=channel_id, text=text)
+            except Exception as notify_error:
+                logger.error("Error notifying %s of the automation failure: %s", user_id, notify_error)
+    
+    async def _execute_automation(self, session: Dict, progress_response):
         """Execute test automation and generate reports."""
-        session = self.user_sessions[user_id]
+        # Use the session passed in; the stored one may expire during a long run
+        test_suite = session['test_suite']
         channel_id = session['channel_id']
         
         # Get automatable tests
         automatable_tests = [tc for tc in test_suite.test_cases if tc.test_type in [TestType.WEB_UI, TestType.API]]
         
-        test_results = []
+        # Scripts normally arrive with the test cases; regenerate any that are missing
+        missing_scripts = [tc for tc in automatable_tests if not tc.automation_script]
+        if missing_scripts:
+            await self.testing_agent.generate_automation_scripts(missing_scripts)
         
-        for i, test_case in enumerate(automatable_tests, 1):
-            # Update progress
-            await self.app.client.chat_update(
-                channel=channel_id,
-                ts=progress_response['ts'],
-                text=f"🤖 Executing test {i}/{len(automatable_tests)}: {test_case.title}..."
-            )
-            
-            try:
-                # Generate automation script
-                script = await self.testing_agent.generate_automation_script(test_case)
-                if not script:
-                    test_results.append({
-                        'title': test_case.title,
-                        'passed': False,
-                        'message': 'Failed to generate automation script',
-                        'duration': '0s',
-                        'screenshot': None,
-                        'video': None
-                    })
-                    continue
-                
-                # Execute automation
-                start_time = datetime.now()
-                success, message, screenshot, video = await self.testing_agent.execute_automation(test_case)
-                end_time = datetime.now()
-                duration = str(end_time - start_time)
-                
-                test_results.append({
-                    'title': test_case.title,
-                    'passed': success,
-                    'message': message,
-                    'duration': duration,
-                    'screenshot': screenshot,
-                    'video': video
-                })
-                
-            except Exception as e:
-                logger.error(f"Error executing test {test_case.title}: {e}")
-                test_results.append({
-                    'title': test_case.title,
-                    'passed': False,
-                    'message': f'Execution failed: {str(e)}',
-                    'duration': '0s',
-                    'screenshot': None,
-                    'video': None
-                })
+        # Run the tests concurrently; a failed test never stops the others. The Playwright
+        # client caps how many web tests hold a browser context at once. Tests only touch
+        # the progress dict, and the pump posts it to Slack at a throttled rate
+        progress = {'done': 0, 'total': len(automatable_tests)}
+        pump = asyncio.create_task(self._progress_pump(channel_id, progress_response['ts'], progress))
+        try:
+            test_results = await asyncio.gather(*[self._run_one(tc, progress) for tc in automatable_tests])
+        finally:
+            pump.cancel()
         
         # Generate test report
         await self.app.client.chat_update(
@@ -355,7 +372,7 @@ class TestingSlackBot:
             text="📊 Generating test report..."
         )
         
-        report_path = await self.testing_agent.generate_test_report(test_results)
+        report_path = await self.testing_agent.generate_test_report(test_results, test_suite)
         
         # Calculate summary
         total_tests = len(test_results)
@@ -386,40 +403,103 @@ class TestingSlackBot:
             ]
         )
         
-        # Upload files if they exist
+        # Upload files if they exist, all at once
+        uploads = []
         for result in test_results:
             if result.get('video') and os.path.exists(result['video']):
-                try:
-                    await self.app.client.files_upload(
-                        channels=channel_id,
-                        file=result['video'],
-                        title=f"Video - {result['title']}",
-                        initial_comment=f"🎥 Test execution video for: *{result['title']}*"
-                    )
-                except Exception as e:
-                    logger.error(f"Error uploading video: {e}")
-            
+                uploads.append((
+                    result['video'],
+                    f"Video - {result['title']}",
+                    f"🎥 Test execution video for: *{result['title']}*"
+                ))
             if result.get('screenshot') and os.path.exists(result['screenshot']):
-                try:
-                    await self.app.client.files_upload(
-                        channels=channel_id,
-                        file=result['screenshot'],
-                        title=f"Screenshot - {result['title']}",
-                        initial_comment=f"📸 Test screenshot for: *{result['title']}*"
-                    )
-                except Exception as e:
-                    logger.error(f"Error uploading screenshot: {e}")
+                uploads.append((
+                    result['screenshot'],
+                    f"Screenshot - {result['title']}",
+                    f"📸 Test screenshot for: *{result['title']}*"
+                ))
+        
+        upload_results = await asyncio.gather(
+            *[
+                self.app.client.files_upload_v2(channel=channel_id, file=path, title=title, initial_comment=comment)
+                for path, title, comment in uploads
+            ],
+            return_exceptions=True
+        )
+        for (path, _, _), upload_result in zip(uploads, upload_results):
+            if isinstance(upload_result, Exception):
+                logger.error("Error uploading %s: %s", path, upload_result)
+    
+    async def _progress_pump(self, channel_id: str, ts: str, progress: Dict):
+        """Post automation progress to Slack at most once per interval until all tests finish."""
+        last_text = None
+        while progress['done'] < progress['total']:
+            await asyncio.sleep(_PROGRESS_INTERVAL)
+            text = f"🤖 Executing tests ({progress['done']}/{progress['total']} done)..."
+            if text == last_text:
+                continue
+            try:
+                await self.app.client.chat_update(channel=channel_id, ts=ts, text=text)
+                last_text = text
+            except Exception as e:
+                logger.error("Error updating automation progress: %s", e)
+    
+    async def _run_one(self, test_case, progress: Dict) -> Dict:
+        """Execute one automated test, count it in progress and return its result."""
+        if not test_case.automation_script:
+            progress['done'] += 1
+            return {
+                'title': test_case.title,
+                'passed': False,
+                'message': 'Failed to generate automation script',
+                'duration': '0s',
+                'screenshot': None,
+                'video': None
+            }
+        
+        try:
+            # Execute automation
+            start_time = datetime.now()
+            success, message, screenshot, video = await self.testing_agent.execute_automation(test_case)
+            end_time = datetime.now()
+            duration = str(end_time - start_time)
+            
+            return {
+                'title': test_case.title,
+                'passed': success,
+                'message': message,
+                'duration': duration,
+                'screenshot': screenshot,
+                'video': video
+            }
+            
+        except Exception as e:
+            logger.error("Error executing test %s: %s", test_case.title, e)
+            return {
+                'title': test_case.title,
+                'passed': False,
+                'message': f'Execution failed: {str(e)}',
+                'duration': '0s',
+                'screenshot': None,
+                'video': None
+            }
+        finally:
+            progress['done'] += 1
     
     async def start(self):
         """Start the Slack bot."""
         await self.testing_agent.initialize()
         
-        handler = AsyncSocketModeHandler(self.app, config.slack_app_token)
+        handler = AsyncSocketModeHandler(self.app, get_config().slack_app_token)
         await handler.start_async()
         
         logger.info("Testing Slack Bot started successfully")
     
     async def stop(self):
         """Stop the Slack bot."""
+        # Abandon unfinished automation runs before their clients go away
+        for job in list(self._automation_jobs):
+            job.cancel()
+        await asyncio.gather(*self._automation_jobs, return_exceptions=True)
         await self.testing_agent.cleanup()
         logger.info("Testing Slack Bot stopped") 
\ No newline at end of file
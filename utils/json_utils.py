@@ -0,0 +1,67 @@
+"""JSON helpers for parsing LLM responses and MCP payloads."""
+import json
+from typing import Any, List
+
+# orjson parses several times faster than the standard library; fall back
+# to json when it is not installed. Both accept str and bytes input.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+
+class JsonArrayStream:
+    """Incrementally extracts the elements of a streamed top-level JSON array."""
+    
+    _decoder = json.JSONDecoder()
+    
+    def __init__(self):
+        self._buffer = ""
+        self._started = False
+        self._finished = False
+    
+    def feed(self, text: str) -> List[Any]:
+        """Add streamed text and return the array elements it completed."""
+        self._buffer += text
+        if self._finished:
+            return []
+        if not self._started:
+            start = self._buffer.find('[')
+            if start == -1:
+                return []
+            self._buffer = self._buffer[start + 1:]
+            self._started = True
+        elif '}' not in text and ']' not in text:
+            # No element can have closed without a closing bracket
+            return []
+        
+        items = []
+        pos = 0
+        while True:
+            while pos < len(self._buffer) and self._buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos >= len(self._buffer):
+                break
+            if self._buffer[pos] == ']':
+                self._finished = True
+                pos += 1
+                break
+            try:
+                item, pos = self._decoder.raw_decode(self._buffer, pos)
+            except ValueError:
+                # The next element has not been fully received yet
+                break
+            items.append(item)
+        
+        self._buffer = self._buffer[pos:]
+        return items
+    
+    def close(self):
+        """Check that the stream ended with a complete array, raising ValueError otherwise."""
+        if not self._started:
+            raise ValueError("stream contained no JSON array")
+        if not self._finished:
+            # Either cut off mid-array or stuck on an element that never parsed
+            raise ValueError(f"JSON array is incomplete or malformed near: {self._buffer[:80]!r}")
+        if self._buffer.strip():
+            raise ValueError(f"unexpected data after JSON array: {self._buffer.strip()[:80]!r}")
@@ -1,42 +1,53 @@
 """Logging configuration for the testing agent."""
 import logging
-import sys
-from config import config
+import logging.config
+from config import get_config
+
+# Application loggers; each writes to the console directly instead of propagating to root
+_APP_LOGGERS = (
+    'agents.testing_agent',
+    'mcp_clients.atlassian_client',
+    'mcp_clients.playwright_client',
+    'slack_bot.bot'
+)
+
+# Noisy external libraries only report warnings and above
+_QUIET_LOGGERS = (
+    'slack_bolt',
+    'slack_sdk',
+    'openai',
+    'httpx'
+)
 
 
 def setup_logging():
     """Setup logging configuration for the application."""
+    level = get_config().log_level.upper()
     
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-    
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    
-    # Configure root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(getattr(logging, config.log_level.upper()))
-    root_logger.addHandler(console_handler)
-    
-    # Configure specific loggers
-    loggers = [
-        'agents.testing_agent',
-        'mcp_clients.atlassian_client',
-        'mcp_clients.playwright_client',
-        'slack_bot.bot'
-    ]
-    
-    for logger_name in loggers:
-        logger = logging.getLogger(logger_name)
-        logger.setLevel(getattr(logging, config.log_level.upper()))
-    
-    # Reduce noise from external libraries
-    logging.getLogger('slack_bolt').setLevel(logging.WARNING)
-    logging.getLogger('slack_sdk').setLevel(logging.WARNING)
-    logging.getLogger('openai').setLevel(logging.WARNING)
-    logging.getLogger('httpx').setLevel(logging.WARNING)
+    logging.config.dictConfig({
+        'version': 1,
+        # Module loggers are created at import time, before this runs
+        'disable_existing_loggers': False,
+        'formatters': {
+            'default': {
+                'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            }
+        },
+        'handlers': {
+            'console': {
+                'class': 'logging.StreamHandler',
+                'formatter': 'default',
+                'stream': 'ext://sys.stdout'
+            }
+        },
+        'loggers': {
+            **{name: {'level': level, 'handlers': ['console'], 'propagate': False} for name in _APP_LOGGERS},
+            **{name: {'level': 'WARNING'} for name in _QUIET_LOGGERS}
+        },
+        'root': {
+            'level': level,
+            'handlers': ['console']
+        }
+    })
     
-    logging.info("Logging configured successfully") 
\ No newline at end of file
+    logging.info("Logging configured successfully")